@@ -1,9 +1,10 @@
 # app.py
 import os
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 
-from apppp.extensions import db, login_manager
+from apppp.extensions import db, login_manager, limiter
 from apppp.routes import register_routes
 from apppp.models import AppUser  # nodig voor login loader
 
@@ -31,9 +32,19 @@ def create_app():
 
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # achter een reverse proxy: aantal vertrouwde proxies die X-Forwarded-For zetten,
+    # anders deelt iedereen het IP van de proxy (ook voor rate limiting)
+    TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+    if TRUSTED_PROXY_HOPS:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS)
+
+    # rate limiting: "memory" (per proces) of "sqlite:///pad/naar/bestand.db" (gedeeld)
+    app.config["RATELIMIT_STORAGE"] = os.environ.get("RATELIMIT_STORAGE", "memory")
+
     # init extensions
     db.init_app(app)
     login_manager.init_app(app)
+    limiter.init_app(app)
 
     # login loader
     @login_manager.user_loader
@@ -0,0 +1,259 @@
+# apppp/catalogue.py
+import re
+import sys
+import threading
+import time
+
+from apppp.extensions import db
+from apppp.models import Employer, JobListing
+
+_WORD_RE = re.compile(r"\w+")
+
+# kolommen die de student-feed nodig heeft (geen ORM-objecten)
+_COLUMNS = (
+    JobListing.id,
+    JobListing.employer_id,
+    JobListing.is_active,
+    JobListing.title,
+    JobListing.client,
+    JobListing.description,
+    JobListing.location,
+    Employer.name,
+)
+
+
+class JobRecord:
+    """Read-only, compact view of one job listing.
+
+    Exposes the same attribute names as `JobListing` that the templates use,
+    plus `token_ids`: the set of integer ids of the words in title,
+    description and location.
+    """
+
+    __slots__ = (
+        "id",
+        "employer_id",
+        "is_active",
+        "title",
+        "client",
+        "description",
+        "location",
+        "company_name",
+        "token_ids",
+    )
+
+    def __init__(self, id, employer_id, is_active, title, client, description, location, company_name, token_ids):
+        self.id = id
+        self.employer_id = employer_id
+        self.is_active = is_active
+        self.title = title
+        self.client = client
+        self.description = description
+        self.location = location
+        self.company_name = company_name
+        self.token_ids = token_ids
+
+
+class CatalogueSnapshot:
+    """Immutable set of job records with a version number.
+
+    A snapshot is never modified after it is published; a refresh builds a new
+    one and swaps it in, so readers never need a lock.
+    """
+
+    __slots__ = ("version", "jobs", "built_at")
+
+    def __init__(self, version, jobs, built_at):
+        self.version = version
+        self.jobs = jobs  # dict: job_id -> JobRecord
+        self.built_at = built_at
+
+    def active_jobs(self):
+        return [j for j in self.jobs.values() if j.is_active]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+
+class JobCatalogue:
+    """Process-wide cache of the job catalogue for read-heavy routes.
+
+    Words are interned once in a shared vocabulary and stored per job as
+    integer ids. Routes that change jobs call `refresh_jobs` or
+    `refresh_employer` after their commit; a full rebuild happens on first
+    use and after `max_age` seconds, which also picks up changes made by
+    other worker processes. While one request rebuilds, the others keep
+    reading the previous snapshot.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._snapshot = None
+        self._vocab = {}  # word -> id, alleen aangevuld (nooit verkleind)
+        self._lock = threading.Lock()
+
+    # -----------------------
+    # Lezen
+    # -----------------------
+    def snapshot(self) -> CatalogueSnapshot:
+        snap = self._snapshot
+        if snap is None:
+            # eerste keer: er is nog geen snapshot om te serveren, dus wachten
+            return self.rebuild(only_if_stale=True)
+        if self._is_stale(snap) and self._lock.acquire(blocking=False):
+            # één request herbouwt, de rest serveert de vorige snapshot
+            try:
+                if self._is_stale(self._snapshot):
+                    self._rebuild_locked()
+            finally:
+                self._lock.release()
+            snap = self._snapshot
+        return snap
+
+    def token_ids(self, words) -> set[int]:
+        """Map words to their vocabulary ids, skipping words no job contains."""
+        vocab = self._vocab
+        return {vocab[w] for w in words if w in vocab}
+
+    # -----------------------
+    # Verversen
+    # -----------------------
+    def rebuild(self, only_if_stale=False) -> CatalogueSnapshot:
+        """Reload the whole catalogue.
+
+        Queries run while holding the lock, so an incremental refresh can
+        never be overwritten by older rows. With `only_if_stale`, a request
+        that waited for another thread's rebuild reuses its result.
+        """
+        with self._lock:
+            if only_if_stale and not self._is_stale(self._snapshot):
+                return self._snapshot
+            return self._rebuild_locked()
+
+    def refresh_jobs(self, job_ids):
+        """Reload the given jobs; ids that no longer exist are dropped."""
+        job_ids = set(job_ids)
+        if not job_ids:
+            return
+        with self._lock:
+            if self._snapshot is None:
+                return
+            rows = self._query().filter(JobListing.id.in_(job_ids)).all()
+            jobs = dict(self._snapshot.jobs)
+            for job_id in job_ids:
+                jobs.pop(job_id, None)
+            for row in rows:
+                jobs[row[0]] = self._record(row)
+            self._publish(jobs)
+
+    def refresh_employer(self, employer_id):
+        """Reload all jobs of one employer, e.g. after a company name change."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            rows = self._query().filter(JobListing.employer_id == employer_id).all()
+            jobs = dict(self._snapshot.jobs)
+            for row in rows:
+                jobs[row[0]] = self._record(row)
+            self._publish(jobs)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    # -----------------------
+    # Intern
+    # -----------------------
+    def _rebuild_locked(self) -> CatalogueSnapshot:
+        built_at = time.monotonic()
+        rows = self._query().all()
+        jobs = {row[0]: self._record(row) for row in rows}
+        return self._publish(jobs, built_at=built_at)
+
+    def _is_stale(self, snap) -> bool:
+        return snap is None or time.monotonic() - snap.built_at > self.max_age
+
+    def _query(self):
+        return db.session.query(*_COLUMNS).outerjoin(Employer, JobListing.employer_id == Employer.id)
+
+    def _record(self, row) -> JobRecord:
+        job_id, employer_id, is_active, title, client, description, location, company_name = row
+        fields = f"{title or ''} {description or ''} {location or ''}".lower()
+
+        vocab = self._vocab
+        ids = set()
+        for word in _WORD_RE.findall(fields):
+            token_id = vocab.get(word)
+            if token_id is None:
+                token_id = vocab[sys.intern(word)] = len(vocab)
+            ids.add(token_id)
+
+        return JobRecord(
+            job_id,
+            employer_id,
+            bool(is_active),
+            title,
+            client,
+            description,
+            location,
+            company_name or "Onbekend",
+            frozenset(ids),
+        )
+
+    def _publish(self, jobs, built_at=None) -> CatalogueSnapshot:
+        # incrementele refreshes houden het tijdstip van de laatste volledige
+        # rebuild, anders schuift elke wijziging de volgende rebuild op
+        prev = self._snapshot
+        if built_at is None:
+            built_at = prev.built_at if prev else time.monotonic()
+        version = prev.version + 1 if prev else 1
+        snap = CatalogueSnapshot(version, jobs, built_at)
+        self._snapshot = snap
+        return snap
+
+
+catalogue = JobCatalogue()
+
+
+if __name__ == "__main__":
+    # benchmark: geheugen per job en kosten van een (incrementele) refresh
+    #   cd app && python -m apppp.catalogue
+    import random
+    import tracemalloc
+
+    from app import create_app
+
+    words = [f"woord{i}" for i in range(5000)]
+    rows = [
+        (i, i % 50, True, "Student job " + random.choice(words), None,
+         " ".join(random.choices(words, k=80)), random.choice(words), "Bedrijf")
+        for i in range(1, 10001)
+    ]
+
+    with create_app().app_context():
+        db.create_all()
+        bench = JobCatalogue()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with bench._lock:
+            bench._publish({row[0]: bench._record(row) for row in rows})
+        build_s = time.perf_counter() - start
+        mem, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        with bench._lock:
+            jobs = dict(bench._snapshot.jobs)
+            jobs[rows[0][0]] = bench._record(rows[0])
+            bench._publish(jobs)
+        refresh_s = time.perf_counter() - start
+
+        print(f"jobs: {len(rows)}, vocab: {len(bench._vocab)}")
+        print(f"full build: {build_s * 1000:.1f} ms")
+        print(f"memory: {mem / len(rows):.0f} bytes/job (records + token sets)")
+        print(f"incremental refresh (1 job): {refresh_s * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        bench.rebuild()
+        print(f"rebuild from db ({len(bench._snapshot.jobs)} jobs): {(time.perf_counter() - start) * 1000:.1f} ms")
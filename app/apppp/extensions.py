@@ -2,6 +2,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from apppp.ratelimit import RateLimiter
+
 db = SQLAlchemy()
 login_manager = LoginManager()
 login_manager.login_view = "login_student"
+limiter = RateLimiter()
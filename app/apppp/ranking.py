@@ -0,0 +1,117 @@
+# apppp/ranking.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+from apppp.catalogue import catalogue
+from apppp.extensions import db
+from apppp.models import Match
+
+
+def diversify(items, key, top_k=20, per_key=3):
+    """Re-rank so the first `top_k` items hold at most `per_key` items per `key`.
+
+    Items over the cap are moved right after the top-K, keeping their order;
+    the rest of the list is left untouched.
+    """
+    top, deferred = [], []
+    counts = {}
+    it = iter(items)
+    for item in it:
+        k = key(item)
+        if counts.get(k, 0) < per_key:
+            counts[k] = counts.get(k, 0) + 1
+            top.append(item)
+            if len(top) == top_k:
+                break
+        else:
+            deferred.append(item)
+    return top + deferred + list(it)
+
+
+class PopularityRanking:
+    """Cached cold-start ranking: active jobs by time-decayed like count.
+
+    Each like counts 0.5 ** (age / half_life); likes older than `horizon`
+    are ignored. Scores are recomputed every `max_age` seconds by one
+    request at a time; other requests keep serving the previous ranking.
+    The sorted list is rebuilt only when the scores or the catalogue
+    snapshot change. The employer cap is applied per student in `feed`,
+    after that student's liked and disliked jobs are removed.
+    """
+
+    def __init__(self, max_age=600, half_life=timedelta(days=7), horizon=timedelta(days=90)):
+        self.max_age = max_age
+        self.half_life = half_life
+        self.horizon = horizon
+        self._scores = None  # (tijdstip, {job_id: score}), in één keer vervangen
+        self._cached = (None, None)  # (ranking_key, gesorteerde jobs)
+        self._refresh_lock = threading.Lock()
+        self._feed_lock = threading.Lock()
+
+    def feed(self, exclude=()):
+        """Return the cold-start feed for one student as a list of `JobRecord`s.
+
+        Jobs in `exclude` (the student's likes and dislikes) are removed
+        before the employer cap, so removing them never lets extra jobs of
+        one employer into the top.
+        """
+        jobs = [j for j in self.ranked_jobs() if j.id not in exclude]
+        return diversify(jobs, key=lambda j: j.employer_id)
+
+    def ranked_jobs(self):
+        """Return all active jobs, most popular first (cached, shared by all students)."""
+        snap = catalogue.snapshot()
+        self._refresh_if_stale()
+
+        scores_at, scores = self._scores
+        ranking_key = (snap.version, scores_at)
+        cached_key, jobs = self._cached
+        if cached_key == ranking_key:
+            return jobs
+
+        with self._feed_lock:
+            cached_key, jobs = self._cached
+            if cached_key != ranking_key:
+                jobs = sorted(snap.active_jobs(), key=lambda j: (scores.get(j.id, 0.0), j.id), reverse=True)
+                self._cached = (ranking_key, jobs)
+        return jobs
+
+    def refresh(self):
+        now = datetime.utcnow()
+        half_life = self.half_life.total_seconds()
+        rows = db.session.query(Match.job_id, Match.matched_at).filter(Match.matched_at >= now - self.horizon)
+
+        scores = {}
+        for job_id, matched_at in rows:
+            age = (now - matched_at).total_seconds()
+            scores[job_id] = scores.get(job_id, 0.0) + 0.5 ** (max(age, 0.0) / half_life)
+
+        self._scores = (time.monotonic(), scores)
+
+    def clear(self):
+        with self._refresh_lock, self._feed_lock:
+            self._scores = None
+            self._cached = (None, None)
+
+    def _is_stale(self):
+        return self._scores is None or time.monotonic() - self._scores[0] > self.max_age
+
+    def _refresh_if_stale(self):
+        if not self._is_stale():
+            return
+        if self._scores is None:
+            # eerste keer: er is nog geen oude feed, dus wachten
+            with self._refresh_lock:
+                if self._is_stale():
+                    self.refresh()
+        elif self._refresh_lock.acquire(blocking=False):
+            # één request ververst, de rest serveert de vorige feed
+            try:
+                if self._is_stale():
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+
+popularity = PopularityRanking()
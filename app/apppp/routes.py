@@ -1,12 +1,14 @@
 # apppp/routes.py
-import re
 from datetime import datetime, timedelta
 
 from flask import render_template, request, redirect, url_for, flash, abort, jsonify
 from flask_login import login_user, login_required, logout_user, current_user
 
-from apppp.extensions import db
+from apppp.catalogue import catalogue
+from apppp.extensions import db, limiter
 from apppp.models import AppUser, Student, RecruiterUser, Employer, JobListing, Match, Dislike
+from apppp.ranking import diversify, popularity
+from apppp.ratelimit import by_email, by_ip, by_user
 
 
 def register_routes(app, supabase=None):
@@ -27,17 +29,27 @@ def register_routes(app, supabase=None):
         rec = get_current_recruiter()
         return bool(rec and rec.employer and job and rec.employer.id == job.employer_id)
 
+    def job_still_exists(job_id):
+        # de feed kan (tot max_age) een vacature tonen die een ander proces al verwijderde
+        if db.session.get(JobListing, job_id):
+            return True
+        catalogue.refresh_jobs([job_id])
+        return False
+
     def populate_jobs_display_fields(jobs):
         for job in jobs:
             job.company_name = job.employer.name if job.employer else "Onbekend"
             job.match_count = len(job.matches or [])
 
-    def tokenize(text: str, stopwords: set[str]) -> list[str]:
-        """Split text into words, lowercased, stopwords removed."""
-        if not text:
-            return []
-        words = re.findall(r"\w+", text.lower())
-        return [w for w in words if w and w not in stopwords]
+    # -----------------------
+    # Rate limits (zie README): per account streng, per IP ruim omdat
+    # studenten op een campusnetwerk vaak hetzelfde IP delen.
+    # -----------------------
+    @app.errorhandler(429)
+    def too_many_requests(e):
+        retry_after = getattr(e, "retry_after", None)
+        headers = {"Retry-After": str(retry_after)} if retry_after else {}
+        return render_template("too_many_requests.html", retry_after=retry_after), 429, headers
 
     # -----------------------
     # ROUTES
@@ -51,6 +63,8 @@ def register_routes(app, supabase=None):
         return render_template("terms.html")
 
     @app.route("/login_bedrijf", methods=["GET", "POST"])
+    @limiter.limit("login", capacity=30, per=60, keys=(by_ip,))
+    @limiter.limit("login", capacity=5, per=60, keys=(by_email,))
     def login_bedrijf():
         if request.method == "POST":
             email = request.form.get("email")
@@ -72,6 +86,8 @@ def register_routes(app, supabase=None):
         return render_template("login_bedrijf.html")
 
     @app.route("/login_student", methods=["GET", "POST"])
+    @limiter.limit("login", capacity=30, per=60, keys=(by_ip,))
+    @limiter.limit("login", capacity=5, per=60, keys=(by_email,))
     def login_student():
         if request.method == "POST":
             agree = request.form.get("agree_terms")
@@ -104,6 +120,7 @@ def register_routes(app, supabase=None):
         return redirect(url_for("index"))
 
     @app.route("/registratie_student", methods=["GET", "POST"])
+    @limiter.limit("registratie", capacity=20, per=600, keys=(by_ip,))
     def registratie_student():
         if request.method == "POST":
             email = request.form.get("email")
@@ -132,6 +149,7 @@ def register_routes(app, supabase=None):
         return render_template("registratie_student.html")
 
     @app.route("/registratie_bedrijf", methods=["GET", "POST"])
+    @limiter.limit("registratie", capacity=20, per=600, keys=(by_ip,))
     def registratie_bedrijf():
         if request.method == "POST":
             company_name = request.form.get("companyName")
@@ -250,6 +268,7 @@ def register_routes(app, supabase=None):
 
             db.session.add(user)
             db.session.commit()
+            catalogue.refresh_employer(employer.id)
             flash("Profiel bijgewerkt.", "success")
             return redirect(url_for("recruiter_dashboard_view"))
 
@@ -290,6 +309,7 @@ def register_routes(app, supabase=None):
         )
         db.session.add(job)
         db.session.commit()
+        catalogue.refresh_jobs([job.id])
 
         flash("Vacature succesvol geplaatst ✅", "success")
         return redirect(url_for("recruiter_dashboard_view"))
@@ -308,6 +328,7 @@ def register_routes(app, supabase=None):
 
         db.session.delete(job)
         db.session.commit()
+        catalogue.refresh_jobs([job_id])
         flash("Vacature verwijderd.", "success")
         return redirect(url_for("recruiter_dashboard_view"))
 
@@ -321,6 +342,21 @@ def register_routes(app, supabase=None):
             flash("Alleen studenten kunnen deze pagina bekijken.", "danger")
             return redirect(url_for("index"))
 
+        # likes/dislikes van student
+        liked_job_ids = {job_id for (job_id,) in db.session.query(Match.job_id).filter_by(user_id=current_user.id)}
+        disliked_job_ids = {job_id for (job_id,) in db.session.query(Dislike.job_id).filter_by(user_id=current_user.id)}
+
+        def cold_start_feed():
+            # nog geen likes: voorberekende populariteitsranking (gecachet)
+            jobs = [
+                {"job": job, "liked": False, "fit_pct": 0, "overlap": 0}
+                for job in popularity.feed(exclude=liked_job_ids | disliked_job_ids)
+            ]
+            return render_template("vacatures_list.html", jobs=jobs)
+
+        if not liked_job_ids:
+            return cold_start_feed()
+
         # stopwords laden (als je utils/stopwords.py hebt)
         stopwords = set()
         try:
@@ -329,28 +365,23 @@ def register_routes(app, supabase=None):
         except Exception:
             stopwords = set()
 
-        # alle actieve jobs
-        jobs = JobListing.query.filter_by(is_active=True).all()
+        # actieve jobs uit de gedeelde catalogus-snapshot (geen ORM-objecten)
+        snap = catalogue.snapshot()
+        stop_ids = catalogue.token_ids(stopwords)
 
-        # likes/dislikes van student
-        liked_matches = Match.query.filter_by(user_id=current_user.id).all()
-        liked_job_ids = [m.job_id for m in liked_matches]
-        disliked_job_ids = [d.job_id for d in Dislike.query.filter_by(user_id=current_user.id).all()]
-
-        # woorden uit liked jobs verzamelen
-        liked_words = []
-        for m in liked_matches:
-            job = JobListing.query.get(m.job_id)
+        # woorden (als token-ids) uit liked jobs verzamelen
+        liked_word_set = set()
+        for job_id in liked_job_ids:
+            job = snap.get(job_id)
             if job:
-                fields = f"{job.title or ''} {job.description or ''} {job.location or ''}"
-                liked_words.extend(tokenize(fields, stopwords))
+                liked_word_set |= job.token_ids
+        liked_word_set -= stop_ids
 
-        liked_word_set = set(liked_words)
+        if not liked_word_set:
+            return cold_start_feed()
 
-        def job_fit_score_and_pct(job: JobListing):
-            fields = f"{job.title or ''} {job.description or ''} {job.location or ''}"
-            job_words = tokenize(fields, stopwords)
-            job_word_set = set(job_words)
+        def job_fit_score_and_pct(job):
+            job_word_set = job.token_ids - stop_ids if stop_ids else job.token_ids
 
             overlap = len(job_word_set & liked_word_set)
             total = len(job_word_set)
@@ -358,11 +389,10 @@ def register_routes(app, supabase=None):
             return overlap, pct
 
         jobs_to_show = []
-        for job in jobs:
+        for job in snap.active_jobs():
             if job.id in liked_job_ids or job.id in disliked_job_ids:
                 continue
 
-            job.company_name = job.employer.name if job.employer else "Onbekend"
             overlap, pct = job_fit_score_and_pct(job)
 
             jobs_to_show.append(
@@ -377,14 +407,23 @@ def register_routes(app, supabase=None):
         # sorteer: hoogste match eerst
         jobs_sorted = sorted(jobs_to_show, key=lambda x: (x["fit_pct"], x["overlap"]), reverse=True)
 
+        # spreiding: max. 3 vacatures per werkgever in de top 20
+        jobs_sorted = diversify(jobs_sorted, key=lambda x: x["job"].employer_id)
+
         return render_template("vacatures_list.html", jobs=jobs_sorted)
 
     @app.route("/jobs/<int:job_id>/like", methods=["POST"])
     @login_required
+    @limiter.limit("swipe", capacity=600, per=60, keys=(by_ip,))
+    @limiter.limit("swipe", capacity=120, per=60, keys=(by_user,))
     def like_job(job_id):
         if getattr(current_user, "role", None) != "student":
             abort(403)
 
+        if not job_still_exists(job_id):
+            flash("Deze vacature bestaat niet meer.", "info")
+            return redirect(url_for("vacatures_student"))
+
         existing = Match.query.filter_by(user_id=current_user.id, job_id=job_id).first()
         if not existing:
             db.session.add(Match(user_id=current_user.id, job_id=job_id))
@@ -394,10 +433,16 @@ def register_routes(app, supabase=None):
 
     @app.route("/jobs/<int:job_id>/dislike", methods=["POST"])
     @login_required
+    @limiter.limit("swipe", capacity=600, per=60, keys=(by_ip,))
+    @limiter.limit("swipe", capacity=120, per=60, keys=(by_user,))
     def dislike_job(job_id):
         if getattr(current_user, "role", None) != "student":
             abort(403)
 
+        if not job_still_exists(job_id):
+            flash("Deze vacature bestaat niet meer.", "info")
+            return redirect(url_for("vacatures_student"))
+
         existing = Dislike.query.filter_by(user_id=current_user.id, job_id=job_id).first()
         if not existing:
             db.session.add(Dislike(user_id=current_user.id, job_id=job_id))
@@ -0,0 +1,36 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# geen echte supabase-client in tests
+os.environ["SUPABASE_URL"] = ""
+os.environ["SUPABASE_KEY"] = ""
+
+from app import create_app  # noqa: E402
+from apppp.catalogue import catalogue  # noqa: E402
+from apppp.extensions import db  # noqa: E402
+from apppp.ranking import popularity  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        catalogue.clear()
+        popularity.clear()
+        yield app
+        db.session.remove()
+    catalogue.clear()
+    popularity.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,93 @@
+# tests/test_catalogue.py
+import time
+
+from apppp.catalogue import JobCatalogue, catalogue
+from apppp.extensions import db
+from apppp.models import AppUser, Dislike, Employer, JobListing, Match
+
+
+def add_jobs(*titles):
+    employer = Employer(name="ACME BV")
+    db.session.add(employer)
+    db.session.flush()
+    jobs = [JobListing(employer_id=employer.id, title=t, is_active=True) for t in titles]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+
+def test_snapshot_records_and_tokens(app):
+    job, = add_jobs("Barista Gent")
+    cat = JobCatalogue()
+
+    rec = cat.snapshot().get(job.id)
+    assert rec.title == "Barista Gent"
+    assert rec.company_name == "ACME BV"
+    assert rec.token_ids == cat.token_ids({"barista", "gent"})
+
+
+def test_refresh_jobs_adds_and_drops(app):
+    first, = add_jobs("Barista")
+    cat = JobCatalogue()
+    version = cat.snapshot().version
+
+    second, = add_jobs("Kelner")
+    cat.refresh_jobs([second.id])
+    db.session.delete(first)
+    db.session.commit()
+    cat.refresh_jobs([first.id])
+
+    snap = cat.snapshot()
+    assert snap.version == version + 2
+    assert snap.get(second.id).title == "Kelner"
+    assert snap.get(first.id) is None
+
+
+def test_incremental_refresh_does_not_postpone_full_rebuild(app):
+    busy, other = add_jobs("Barista", "Kelner")
+    cat = JobCatalogue(max_age=0.2)
+    cat.snapshot()
+
+    # wijziging door een ander proces: deze catalogus krijgt geen refresh voor `other`
+    db.session.query(JobListing).filter_by(id=other.id).update({"title": "Afwasser"})
+    db.session.commit()
+
+    for _ in range(4):
+        time.sleep(0.1)
+        cat.refresh_jobs([busy.id])
+
+    assert cat.snapshot().get(other.id).title == "Afwasser"
+
+
+def test_stale_snapshot_is_served_while_another_request_rebuilds(app):
+    add_jobs("Barista")
+    cat = JobCatalogue(max_age=0)
+    snap = cat.snapshot()
+    time.sleep(0.01)
+
+    with cat._lock:  # een andere request is al aan het herbouwen
+        assert cat.snapshot() is snap
+    assert cat.snapshot() is not snap
+
+
+def test_like_on_deleted_job_does_not_insert_match(app, client):
+    job, = add_jobs("Barista")
+    student = AppUser(email="s@example.com", role="student")
+    student.set_password("geheim")
+    db.session.add(student)
+    db.session.commit()
+    catalogue.snapshot()
+
+    # een ander proces verwijdert de vacature; deze catalogus weet het nog niet
+    db.session.query(JobListing).filter_by(id=job.id).delete()
+    db.session.commit()
+    assert catalogue.snapshot().get(job.id) is not None
+
+    client.post("/login_student", data={"email": "s@example.com", "password": "geheim", "agree_terms": "on"})
+    for action in ("like", "dislike"):
+        response = client.post(f"/jobs/{job.id}/{action}")
+        assert response.status_code == 302
+
+    assert Match.query.count() == 0
+    assert Dislike.query.count() == 0
+    assert catalogue.snapshot().get(job.id) is None
@@ -0,0 +1,105 @@
+# tests/test_ranking.py
+import re
+
+from apppp.extensions import db
+from apppp.models import AppUser, Dislike, Employer, JobListing, Match
+from apppp.ranking import PopularityRanking, diversify
+
+
+def test_diversify_caps_items_per_key_in_top_k():
+    items = ["a1", "a2", "a3", "b1", "a4", "c1"]
+    result = diversify(items, key=lambda x: x[0], top_k=4, per_key=2)
+    assert result[:4] == ["a1", "a2", "b1", "c1"]
+
+
+def test_diversify_moves_overflow_after_top_k_in_order():
+    items = ["a1", "a2", "a3", "a4", "b1", "b2", "a5"]
+    result = diversify(items, key=lambda x: x[0], top_k=3, per_key=2)
+    assert result == ["a1", "a2", "b1", "a3", "a4", "b2", "a5"]
+
+
+def test_diversify_short_list_keeps_everything():
+    items = ["a1", "a2", "a3"]
+    assert diversify(items, key=lambda x: x[0], top_k=20, per_key=2) == ["a1", "a2", "a3"]
+    assert diversify([], key=lambda x: x) == []
+
+
+def add_liked_job_data():
+    employer = Employer(name="ACME BV")
+    fan = AppUser(email="fan@example.com", role="student")
+    fan.set_password("geheim")
+    db.session.add_all([employer, fan])
+    db.session.flush()
+    quiet = JobListing(employer_id=employer.id, title="Stil", is_active=True)
+    popular = JobListing(employer_id=employer.id, title="Populair", is_active=True)
+    db.session.add_all([quiet, popular])
+    db.session.flush()
+    db.session.add(Match(user_id=fan.id, job_id=popular.id))
+    db.session.commit()
+    return quiet, popular
+
+
+def test_popularity_feed_orders_by_likes(app):
+    quiet, popular = add_liked_job_data()
+
+    ranking = PopularityRanking()
+    assert [j.id for j in ranking.feed()] == [popular.id, quiet.id]
+    assert [j.id for j in ranking.feed(exclude={popular.id})] == [quiet.id]
+    assert ranking.ranked_jobs() is ranking.ranked_jobs()
+
+
+def test_stale_scores_are_served_while_another_request_refreshes(app, monkeypatch):
+    add_liked_job_data()
+    ranking = PopularityRanking(max_age=0)
+    jobs = ranking.ranked_jobs()
+
+    calls = []
+    monkeypatch.setattr(ranking, "refresh", lambda: calls.append(1))
+    with ranking._refresh_lock:  # een andere request is al aan het verversen
+        assert ranking.ranked_jobs() is jobs
+    assert calls == []
+
+
+def test_new_student_gets_popularity_feed(app, client):
+    quiet, popular = add_liked_job_data()
+    student = AppUser(email="nieuw@example.com", role="student")
+    student.set_password("geheim")
+    db.session.add(student)
+    db.session.commit()
+
+    client.post("/login_student", data={"email": "nieuw@example.com", "password": "geheim", "agree_terms": "on"})
+    html = client.get("/vacatures_student").get_data(as_text=True)
+    assert html.index("Populair") < html.index("Stil")
+
+
+def test_disliking_a_job_keeps_employer_cap_in_top_20(app, client):
+    fan = AppUser(email="fan@example.com", role="student")
+    fan.set_password("geheim")
+    student = AppUser(email="nieuw@example.com", role="student")
+    student.set_password("geheim")
+    db.session.add_all([fan, student])
+
+    # werkgever A: 10 populaire vacatures; 8 andere werkgevers met elk 3 vacatures
+    jobs = {}
+    for name, count in [("A", 10)] + [(chr(ord("B") + i), 3) for i in range(8)]:
+        employer = Employer(name=f"Bedrijf {name}")
+        db.session.add(employer)
+        db.session.flush()
+        for i in range(count):
+            job = JobListing(employer_id=employer.id, title=f"Vacature {name}{i:02d}", is_active=True)
+            db.session.add(job)
+            jobs.setdefault(name, []).append(job)
+    db.session.flush()
+    for job in jobs["A"]:
+        db.session.add(Match(user_id=fan.id, job_id=job.id))
+    # dislike van een vacature van een andere werkgever uit de top 20
+    db.session.add(Dislike(user_id=student.id, job_id=jobs["I"][-1].id))
+    db.session.commit()
+
+    client.post("/login_student", data={"email": "nieuw@example.com", "password": "geheim", "agree_terms": "on"})
+    html = client.get("/vacatures_student").get_data(as_text=True)
+
+    employers = re.findall(r"Vacature (\w)\d\d", html)
+    assert len(employers) == 33
+    top = employers[:20]
+    assert max(top.count(e) for e in set(top)) <= 3
@@ -0,0 +1,125 @@
+# tests/test_ratelimit.py
+import sqlite3
+import time
+
+import pytest
+
+from app import create_app
+from apppp.ratelimit import MemoryBackend, SQLiteBackend, _refill
+
+
+def test_refill_allows_while_tokens_left():
+    assert _refill(3, 0, 0, capacity=3, per=60) == (2, 0.0)
+
+
+def test_refill_returns_wait_time_when_empty():
+    tokens, retry_after = _refill(0, 0, 0, capacity=3, per=60)
+    assert tokens == 0
+    assert retry_after == pytest.approx(20)
+
+
+def test_refill_adds_tokens_over_time_up_to_capacity():
+    assert _refill(0, 0, 20, capacity=3, per=60) == pytest.approx((0, 0.0))
+    assert _refill(0, 0, 1000, capacity=3, per=60) == (2, 0.0)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / "ratelimit.db"))
+
+
+def test_backend_limits_per_key(backend):
+    assert [backend.take("a", 2, 60) for _ in range(3)][:2] == [0.0, 0.0]
+    assert backend.take("a", 2, 60) > 0
+    assert backend.take("b", 2, 60) == 0.0
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+    assert first.take("login:by_ip:1.2.3.4", 1, 60) == 0.0
+    assert second.take("login:by_ip:1.2.3.4", 1, 60) > 0
+
+
+def test_sqlite_cleanup_deletes_only_refilled_buckets(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "ratelimit.db"))
+    backend.take("kort", 1, 1)
+    backend.take("lang", 1, 600)
+
+    backend.cleanup(now=backend._connect().execute("SELECT MAX(updated) FROM rate_limit_bucket").fetchone()[0] + 2)
+
+    keys = [k for (k,) in backend._connect().execute("SELECT key FROM rate_limit_bucket")]
+    assert keys == ["lang"]
+
+
+def test_memory_prune_keeps_exhausted_buckets_with_longer_period():
+    backend = MemoryBackend(max_keys=10)
+    backend.take("registratie", 1, 600)
+    assert backend.take("registratie", 1, 600) > 0
+
+    # veel korte buckets (andere periode) vullen de tabel en forceren een prune
+    for i in range(9):
+        backend.take(f"login:{i}", 5, 0.001)
+    time.sleep(0.01)
+    backend.take("login:nieuw", 5, 60)
+
+    assert backend.take("registratie", 1, 600) > 0
+
+
+def test_login_returns_429_page_with_retry_after(client):
+    data = {"email": "iemand@example.com", "password": "fout", "agree_terms": "on"}
+    statuses = [client.post("/login_student", data=data).status_code for _ in range(5)]
+    assert statuses == [302] * 5
+
+    response = client.post("/login_student", data=data)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert "Te veel pogingen" in response.get_data(as_text=True)
+
+    # ander account vanaf hetzelfde IP mag nog
+    other = dict(data, email="ander@example.com")
+    assert client.post("/login_student", data=other).status_code == 302
+
+
+def lock_database(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("BEGIN EXCLUSIVE")
+    return conn
+
+
+def test_sqlite_backend_lets_requests_through_when_locked(tmp_path, caplog):
+    path = str(tmp_path / "ratelimit.db")
+    backend = SQLiteBackend(path, timeout=0.01)
+    holder = lock_database(path)
+    try:
+        assert backend.take("a", 1, 60) == 0.0
+        assert backend.take("a", 1, 60) == 0.0
+    finally:
+        holder.execute("ROLLBACK")
+    assert "unavailable" in caplog.text
+
+
+def test_login_works_when_rate_limit_storage_is_locked(app, client, tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    app.extensions["ratelimit"] = SQLiteBackend(path, timeout=0.01)
+    holder = lock_database(path)
+    try:
+        data = {"email": "iemand@example.com", "password": "fout", "agree_terms": "on"}
+        assert client.post("/login_student", data=data).status_code == 302
+    finally:
+        holder.execute("ROLLBACK")
+
+
+def test_rate_limit_can_be_disabled_after_create_app(app, client):
+    app.config["RATELIMIT_ENABLED"] = False
+    data = {"email": "iemand@example.com", "password": "fout", "agree_terms": "on"}
+    statuses = {client.post("/login_student", data=data).status_code for _ in range(10)}
+    assert statuses == {302}
+
+
+def test_each_app_keeps_its_own_backend(app):
+    other = create_app()
+    assert other.extensions["ratelimit"] is not app.extensions["ratelimit"]